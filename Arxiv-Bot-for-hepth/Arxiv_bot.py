@@ -1,6 +1,8 @@
 import argparse
+import asyncio
 import json
 import os
+import re
 import sys
 import time
 from datetime import datetime, timedelta, timezone
@@ -8,42 +10,122 @@ from html import escape
 from pathlib import Path
 from urllib.parse import quote
 
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Optional, Tuple
 
+# bs4 is only needed for scraping; keep the --test path usable without it.
+try:
+    from bs4 import BeautifulSoup, SoupStrainer  # type: ignore
+    import soupsieve  # bs4 dependency; backs the .select()/.select_one() API
+
+    # Compiled once at import; per-entry extraction then skips soupsieve's
+    # pattern-cache lookup on every call.
+    _SEL_ABS_A = soupsieve.compile('a[href^="/abs/"]')
+    _SEL_PDF_A = soupsieve.compile('a[href^="/pdf/"]')
+    _SEL_TITLE = soupsieve.compile("div.list-title")
+    _SEL_AUTHOR_LINKS = soupsieve.compile("div.list-authors a")
+    _SEL_COMMENTS = soupsieve.compile("div.list-comments")
+    _SEL_ABSTRACT = soupsieve.compile(
+        'span[class*="abstract"], p[class*="abstract"], p.mathjax'
+    )
+except ImportError:  # pragma: no cover
+    BeautifulSoup = None  # type: ignore
+    SoupStrainer = None  # type: ignore
+
+
+# orjson is a C-accelerated JSON codec; fall back to stdlib json when absent.
+try:
+    import orjson
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj, separators=(",", ":"))
+
+    _json_loads = json.loads
+
+try:
+    from zoneinfo import ZoneInfo  # Python 3.9+
+
+    _BERLIN = ZoneInfo("Europe/Berlin")
+except Exception:  # pragma: no cover
+    _BERLIN = None
+
 
 BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 
+# BOT_TOKEN is frozen at import, so the endpoint URL can be too.
+_SEND_URL = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
+
+# Shared session so every Telegram call reuses one keep-alive connection
+# instead of paying a fresh TCP+TLS handshake per message.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0))
+
+# Matches the arXiv ids in /abs/NNNN.NNNNN links on the raw listing HTML.
+_ABS_RE = re.compile(r"/abs/(\d{4}\.\d{4,6})")
+
+# Locates the "New submissions" section header in the raw listing HTML.
+_H3_NEW_RE = re.compile(r"<h3[^>]*>[^<]*New submissions")
+
 STATE_DIR = Path(__file__).with_name(".state")
 STATE_PATH = STATE_DIR / "posted.json"
+# Append-only crash log: ids are written here right after each successful
+# send, then folded into posted.json at the end of the run.
+LOG_PATH = STATE_DIR / "posted.log"
 MAX_TRACKED_IDS = 2000
 
 
-def _load_state() -> Tuple[set[str], Optional[str]]:
-    if not STATE_PATH.exists():
-        return set(), None
-    try:
-        data = json.loads(STATE_PATH.read_text(encoding="utf-8"))
-        posted = set(data.get("posted_ids", []))
-        last_run = data.get("last_run_iso")
-        return posted, last_run
-    except Exception:
-        return set(), None
+def _load_state() -> Tuple[list[str], Optional[str], dict]:
+    posted: list[str] = []
+    last_run: Optional[str] = None
+    validators: dict = {}
+    if STATE_PATH.exists():
+        try:
+            data = _json_loads(STATE_PATH.read_bytes())
+            # Insertion-ordered: oldest first, so truncation drops the oldest ids.
+            posted = list(data.get("posted_ids", []))
+            last_run = data.get("last_run_iso")
+            # HTTP validators from the last successful listing fetch
+            validators = {k: data[k] for k in ("etag", "last_modified") if data.get(k)}
+        except Exception:
+            posted, last_run, validators = [], None, {}
+    # Fold in the crash log: if a previous run died mid-send, these ids never
+    # made it into posted.json but were already delivered.
+    if LOG_PATH.exists():
+        try:
+            known = set(posted)
+            for line in LOG_PATH.read_text(encoding="utf-8").splitlines():
+                entry_id = line.strip()
+                if entry_id and entry_id not in known:
+                    posted.append(entry_id)
+                    known.add(entry_id)
+        except Exception:
+            pass
+    return posted, last_run, validators
 
 
-def _save_state(posted_ids: set[str], last_run_iso: str) -> None:
+def _save_state(
+    posted_ids: list[str], last_run_iso: Optional[str], validators: Optional[dict] = None
+) -> None:
     STATE_DIR.mkdir(parents=True, exist_ok=True)
-    ids = sorted(posted_ids)
+    ids = list(posted_ids)
     if len(ids) > MAX_TRACKED_IDS:
         ids = ids[-MAX_TRACKED_IDS:]
-    STATE_PATH.write_text(
-        json.dumps({"posted_ids": ids, "last_run_iso": last_run_iso}, indent=2, sort_keys=True),
-        encoding="utf-8",
-    )
+    state = {"posted_ids": ids, "last_run_iso": last_run_iso}
+    if validators:
+        state.update({k: validators[k] for k in ("etag", "last_modified") if validators.get(k)})
+    STATE_PATH.write_text(_json_dumps(state), encoding="utf-8")
+    # Everything in the crash log is now in posted.json; drop it.
+    LOG_PATH.unlink(missing_ok=True)
 
 
 def send_message(chat_id: str, text: str, parse_mode: str = "HTML") -> dict:
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
     payload = {
         "chat_id": chat_id,
         "text": text,
@@ -52,24 +134,36 @@ def send_message(chat_id: str, text: str, parse_mode: str = "HTML") -> dict:
     }
     backoff = 1.0
     for _ in range(6):
-        resp = requests.post(url, json=payload, timeout=30)
+        resp = _SESSION.post(_SEND_URL, json=payload, timeout=30)
         if resp.status_code == 429:
-            try:
-                retry_after = resp.json().get("parameters", {}).get("retry_after", None)
-            except Exception:
-                retry_after = None
-            time.sleep((retry_after or backoff))
+            # Telegram sets a Retry-After header; only fall back to decoding
+            # the JSON body when it is missing.
+            retry_after = resp.headers.get("Retry-After")
+            if retry_after is not None:
+                try:
+                    retry_after = int(retry_after)
+                except ValueError:
+                    retry_after = None
+            if retry_after is None:
+                try:
+                    retry_after = resp.json().get("parameters", {}).get("retry_after", None)
+                except Exception:
+                    retry_after = None
+            time.sleep(retry_after or backoff)
             backoff = min(backoff * 2, 8)
             continue
         resp.raise_for_status()
-        return resp.json()
+        data = resp.json()
+        # Hand the connection back to the pool immediately.
+        resp.close()
+        return data
     resp.raise_for_status()
     return resp.json()
 
 
 def get_chat(chat_id: str) -> dict:
     url = f"https://api.telegram.org/bot{BOT_TOKEN}/getChat"
-    resp = requests.get(url, params={"chat_id": chat_id}, timeout=30)
+    resp = _SESSION.get(url, params={"chat_id": chat_id}, timeout=30)
     resp.raise_for_status()
     return resp.json()
 
@@ -100,9 +194,10 @@ def _extract_entries_after_header(soup):
         elif node.name == "dd" and pending_dt is not None:
             dt, dd = pending_dt, node
             pending_dt = None
-            # Extract arXiv abs/pdf from the dt block
-            abs_a = dt.find("a", href=lambda h: h and h.startswith("/abs/"))
-            pdf_a = dt.find("a", href=lambda h: h and h.startswith("/pdf/"))
+            # Extract arXiv abs/pdf from the dt block. CSS selectors run in
+            # soupsieve's compiled matcher instead of a Python lambda per tag.
+            abs_a = _SEL_ABS_A.select_one(dt)
+            pdf_a = _SEL_PDF_A.select_one(dt)
             abs_url = f"https://arxiv.org{abs_a['href']}" if abs_a and abs_a.has_attr('href') else ""
             pdf_url = (
                 f"https://arxiv.org{pdf_a['href']}" if pdf_a and pdf_a.has_attr('href') else ""
@@ -114,18 +209,17 @@ def _extract_entries_after_header(soup):
                     pdf_url = f"https://arxiv.org/pdf/{aid}.pdf"
                 except Exception:
                     pass
-            title_div = dd.find("div", class_=lambda c: c and "list-title" in c)
+            title_div = _SEL_TITLE.select_one(dd)
             title = (
                 title_div.get_text(" ", strip=True).replace("Title:", "").strip()
                 if title_div
                 else ""
             )
 
-            authors_div = dd.find("div", class_=lambda c: c and "list-authors" in c)
-            author_links = authors_div.find_all("a") if authors_div else []
+            author_links = _SEL_AUTHOR_LINKS.select(dd)
             authors = [a.get_text(strip=True) for a in author_links]
 
-            comments_div = dd.find("div", class_=lambda c: c and "list-comments" in c)
+            comments_div = _SEL_COMMENTS.select_one(dd)
             comments = (
                 comments_div.get_text(" ", strip=True).replace("Comments:", "").strip()
                 if comments_div
@@ -133,9 +227,7 @@ def _extract_entries_after_header(soup):
             )
 
             # Abstract may be present as <p class="mathjax"> or hidden span with 'abstract-full'
-            abstract_span = dd.find(["span", "p"], class_=lambda c: c and "abstract" in c)
-            if not abstract_span:
-                abstract_span = dd.find("p", class_=lambda c: c and "mathjax" in c)
+            abstract_span = _SEL_ABSTRACT.select_one(dd)
             abstract = abstract_span.get_text(" ", strip=True) if abstract_span else ""
 
             entries.append(
@@ -152,11 +244,13 @@ def _extract_entries_after_header(soup):
     return entries
 
 
+# Exactauthor search on Inspire HEP; %22 is the pre-quoted surrounding '"'.
+# Example: https://inspirehep.net/authors?sort=bestmatch&size=25&page=1&q=%22First%20Last%22
+_INSPIRE_URL_TMPL = "https://inspirehep.net/authors?sort=bestmatch&size=25&page=1&q=%22{}%22"
+
+
 def _inspire_author_link(name: str) -> str:
-    # Use an exactauthor search on Inspire HEP.
-    # Example: https://inspirehep.net/authors?search=exactauthor%3A%22First%20Last%22
-    q = quote(f'"{name}"')
-    return f"https://inspirehep.net/authors?sort=bestmatch&size=25&page=1&q={q}"
+    return _INSPIRE_URL_TMPL.format(quote(name, safe=""))
 
 
 def format_entry_html(entry: dict) -> str:
@@ -165,11 +259,13 @@ def format_entry_html(entry: dict) -> str:
     comments = escape(entry.get("comments", "")).strip()
     abstract = escape(entry.get("abstract", "")).strip()
 
-    # Authors with Inspire links
-    linked_authors = []
-    for name in entry.get("authors", []):
-        url = _inspire_author_link(name)
-        linked_authors.append(f'<a href="{url}">{escape(name)}</a>')
+    # Authors with Inspire links; hoist the lookups out of the loop since
+    # long author lists (30+) make the per-call overhead measurable.
+    _esc = escape
+    _link = _inspire_author_link
+    linked_authors = [
+        f'<a href="{_link(name)}">{_esc(name)}</a>' for name in entry.get("authors", ())
+    ]
     authors_html = ", ".join(linked_authors) if linked_authors else ""
 
     parts = []
@@ -194,19 +290,19 @@ def format_entry_html(entry: dict) -> str:
 
     text = "\n".join(parts)
 
-    # Telegram message limit is 4096 characters
-    if len(text) > 4000:
-        text = text[:3950] + "..."
+    # Telegram's 4096 limit counts UTF-16 code units, not Python characters;
+    # trim on that measure (with headroom) so long messages aren't rejected.
+    while len(text.encode("utf-16-le")) // 2 > 4000:
+        text = text[:-50] + "..."
     return text
 
 
-def scrape_hep_th_new() -> list:
+def scrape_hep_th_new(
+    validators: Optional[dict] = None, known_ids: Optional[set] = None
+) -> Tuple[list, dict]:
     url = "https://arxiv.org/list/hep-th/new"
-    # Lazy import to avoid requiring bs4 for --test path
-    try:
-        from bs4 import BeautifulSoup  # type: ignore
-    except Exception as e:
-        raise RuntimeError("beautifulsoup4 is required for scraping. Install bs4.") from e
+    if BeautifulSoup is None:
+        raise RuntimeError("beautifulsoup4 is required for scraping. Install bs4.")
 
     headers = {
         "User-Agent": (
@@ -214,11 +310,104 @@ def scrape_hep_th_new() -> list:
             "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
         )
     }
-    r = requests.get(url, timeout=30, headers=headers)
+    # Conditional GET: on days where arxiv hasn't republished the listing
+    # (weekends, holidays) a 304 lets us skip both the body and the parse.
+    validators = validators or {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    r = _SESSION.get(url, timeout=30, headers=headers)
+    if r.status_code == 304:
+        return [], validators
     r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
+    new_validators = {}
+    if r.headers.get("ETag"):
+        new_validators["etag"] = r.headers["ETag"]
+    if r.headers.get("Last-Modified"):
+        new_validators["last_modified"] = r.headers["Last-Modified"]
+    # Cheap regex pre-check: if every /abs/ id on the page was already posted,
+    # there is nothing new and we can skip building a soup entirely.
+    if known_ids:
+        all_ids = set(_ABS_RE.findall(r.text))
+        if all_ids and all_ids <= known_ids:
+            return [], new_validators
+    # Bound the parse to the "New submissions" section: cut the raw HTML at
+    # its <h3> and again at the next <h3>, so the parser never materializes
+    # nodes for the cross-lists/replacements that follow.
+    text = r.text
+    m = _H3_NEW_RE.search(text)
+    if m is not None:
+        end = text.find("<h3", m.end())
+        text = text[m.start():end] if end != -1 else text[m.start():]
+    # lxml is a C parser (much faster than html.parser) and the strainer keeps
+    # the soup restricted to the tags the extraction actually looks at.
+    strainer = SoupStrainer(["h3", "dt", "dd", "div", "a", "span", "p"])
+    soup = BeautifulSoup(text, "lxml", parse_only=strainer)
     entries = _extract_entries_after_header(soup)
-    return entries
+    return entries, new_validators
+
+
+async def _send_async(session, chat_id: str, text: str, parse_mode: str = "HTML") -> dict:
+    # Async twin of send_message with the same 429 backoff behaviour.
+    payload = {
+        "chat_id": chat_id,
+        "text": text,
+        "parse_mode": parse_mode,
+        "disable_web_page_preview": True,
+    }
+    backoff = 1.0
+    for _ in range(6):
+        async with session.post(
+            _SEND_URL, json=payload, timeout=aiohttp.ClientTimeout(total=30)
+        ) as resp:
+            if resp.status == 429:
+                retry_after = resp.headers.get("Retry-After")
+                if retry_after is not None:
+                    try:
+                        retry_after = int(retry_after)
+                    except ValueError:
+                        retry_after = None
+                if retry_after is None:
+                    try:
+                        data = await resp.json()
+                        retry_after = data.get("parameters", {}).get("retry_after", None)
+                    except Exception:
+                        retry_after = None
+                await asyncio.sleep(retry_after or backoff)
+                backoff = min(backoff * 2, 8)
+                continue
+            resp.raise_for_status()
+            return await resp.json()
+    raise RuntimeError("sendMessage still rate-limited after retries")
+
+
+async def _paced_send(sem, session, chat_id: str, text: str, entry_id=None, logf=None) -> None:
+    # Telegram allows ~1 msg/sec per chat, so serialize sends through the
+    # semaphore and pace inside it; everything else overlaps with the wait.
+    async with sem:
+        await _send_async(session, chat_id, text)
+        if entry_id and logf is not None:
+            # ~15 bytes fsynced per message: a crash mid-run can no longer
+            # replay already-delivered entries.
+            logf.write(entry_id + "\n")
+            logf.flush()
+            os.fsync(logf.fileno())
+        await asyncio.sleep(1.1)
+
+
+async def _dispatch(chat_id: str, messages: list) -> None:
+    sem = asyncio.Semaphore(1)
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    connector = aiohttp.TCPConnector(limit=4, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        with open(LOG_PATH, "a", encoding="utf-8") as logf:
+            await asyncio.gather(
+                *[
+                    _paced_send(sem, session, chat_id, text, entry_id, logf)
+                    for entry_id, text in messages
+                ]
+            )
 
 
 def _extract_entry_id(entry: dict) -> Optional[str]:
@@ -232,47 +421,51 @@ def _extract_entry_id(entry: dict) -> Optional[str]:
     return None
 
 
-def run_once_and_post(chat_id: str) -> None:
-    entries = scrape_hep_th_new()
-    posted_ids, _ = _load_state()
+def run_once_and_post(chat_id: str, now: Optional[datetime] = None) -> None:
+    if now is None:
+        now = datetime.now(timezone.utc)
+    posted_list, last_run, validators = _load_state()
+    posted_ids = frozenset(posted_list)
+    entries, validators = scrape_hep_th_new(validators, known_ids=posted_ids)
     newly_posted: list[str] = []
 
+    # Build all messages up front, then dispatch them asynchronously so the
+    # per-chat pacing sleep overlaps with request I/O instead of serializing
+    # behind it.
+    messages: list[Tuple[Optional[str], str]] = []
+    seen_this_run: set[str] = set()
     for entry in entries:
         entry_id = _extract_entry_id(entry)
-        if entry_id and entry_id in posted_ids:
+        if entry_id and (entry_id in posted_ids or entry_id in seen_this_run):
             continue
 
         msg = format_entry_html(entry)
         if not msg:
             continue
 
-        send_message(chat_id, msg, parse_mode="HTML")
+        messages.append((entry_id, msg))
         newly_posted.append(entry_id or "")
         if entry_id:
-            posted_ids.add(entry_id)
+            seen_this_run.add(entry_id)
+            posted_list.append(entry_id)
 
-        # be nice to Telegram API: ~1 msg/sec to a single chat
-        time.sleep(1.2)
+    if messages:
+        asyncio.run(_dispatch(chat_id, messages))
 
     if newly_posted:
-        _save_state(posted_ids, datetime.now(timezone.utc).isoformat())
+        last_run = now.isoformat()
         print(f"Posted {len([i for i in newly_posted if i])} new submissions.")
     else:
         print("No new submissions to post.")
+    _save_state(posted_list, last_run, validators)
 
 
 def _is_weekend_berlin(now: Optional[datetime] = None) -> bool:
-    try:
-        from zoneinfo import ZoneInfo
-    except Exception:  # pragma: no cover
-        ZoneInfo = None  # type: ignore
-
     if now is None:
         now = datetime.now(timezone.utc)
 
-    if ZoneInfo is not None:
-        berlin = ZoneInfo("Europe/Berlin")
-        dow = now.astimezone(berlin).weekday()
+    if _BERLIN is not None:
+        dow = now.astimezone(_BERLIN).weekday()
     else:
         dow = now.weekday()  # fallback UTC
     return dow >= 5  # 5=Sat, 6=Sun
@@ -280,15 +473,10 @@ def _is_weekend_berlin(now: Optional[datetime] = None) -> bool:
 
 def seconds_until_next_8am_cet(now_utc: datetime | None = None) -> int:
     # CET/CEST handling: derive 8am in Europe/Berlin local time
-    try:
-        from zoneinfo import ZoneInfo  # Python 3.9+
-    except Exception:  # pragma: no cover
-        ZoneInfo = None
-
     if now_utc is None:
         now_utc = datetime.utcnow()
 
-    if ZoneInfo is None:
+    if _BERLIN is None:
         # Fallback: assume CET fixed offset (+1) without DST (approximation)
         local_now = now_utc + timedelta(hours=1)
         target_local = local_now.replace(hour=8, minute=0, second=0, microsecond=0)
@@ -297,9 +485,8 @@ def seconds_until_next_8am_cet(now_utc: datetime | None = None) -> int:
         delta = target_local - local_now
         return int(delta.total_seconds())
 
-    berlin = ZoneInfo("Europe/Berlin")
     # compute now in Berlin time
-    now_local = datetime.now(tz=berlin)
+    now_local = datetime.now(tz=_BERLIN)
     target = now_local.replace(hour=8, minute=0, second=0, microsecond=0)
     if now_local >= target:
         target += timedelta(days=1)
@@ -387,8 +574,12 @@ def main(argv=None):
     if force_post:
         print("FORCE_POST enabled — bypassing weekend/no-update guards.")
 
+    # One timestamp for the whole run; the guards and the state save below
+    # all derive from it instead of re-reading the clock.
+    now = datetime.now(timezone.utc)
+
     # Weekend guard (belt-and-suspenders with workflow-level guard)
-    if not force_post and _is_weekend_berlin():
+    if not force_post and _is_weekend_berlin(now):
         print("Weekend detected (Europe/Berlin). Skipping run.")
         return
 
@@ -408,7 +599,7 @@ def main(argv=None):
     if args.once:
         if force_post:
             print("FORCE_POST enabled — weekend guard bypassed but duplicates still suppressed.")
-        run_once_and_post(chat_id)
+        run_once_and_post(chat_id, now=now)
         print("Posted current new submissions.")
         return
 